@@ -1,13 +1,36 @@
 import os
+
+# Cooperative I/O for gevent workers: must run before anything else imports
+# socket/threading, and psycopg2 needs its own wait callback on top.
+if os.environ.get("USE_GEVENT"):
+    from gevent import monkey
+    monkey.patch_all()
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
 import re
-from urllib.parse import urlparse
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
 import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import execute_values
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import spotipy
 from spotipy import Spotify
-from spotipy.oauth2 import SpotifyOAuth
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth, SpotifyOauthError
 
 # ==== CONFIG / AUTH ====
 SPOTIFY_CLIENT_ID = os.environ.get("SPOTIFY_CLIENT_ID")
@@ -18,46 +41,223 @@ SPOTIFY_REFRESH_TOKEN = os.environ.get("SPOTIFY_REFRESH_TOKEN")
 # Minimal scope for metadata lookups
 SCOPE = "playlist-read-private playlist-read-collaborative user-library-read"
 
+class OrjsonProvider(JSONProvider):
+    # jsonify() and request.get_json() both go through orjson
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__, static_folder="static", static_url_path="/static")
+app.json = OrjsonProvider(app)
 app.config["JSON_SORT_KEYS"] = False
 # Enable CORS for GitHub Pages and local dev; adjust origins as needed
 CORS(app, origins=["https://gbonez.github.io", "http://localhost:5000"]) 
 
+# Shared keep-alive session for all Spotify calls (API and token refresh),
+# with backoff on rate limits and transient 5xx
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# ==== SPOTIFY TOKEN ====
+# One refresh at a time: concurrent callers share the in-flight Future, and a
+# background timer renews the token before it expires so requests just read
+# _current_token.
+_token_lock = threading.Lock()
+_inflight = None
+_current_token = None
+_token_expires_at = 0
+_refresh_timer = None
+_refresh_failed_at = 0
+TOKEN_RETRY_DELAY = 60
+
+def _schedule_refresh(delay):
+    global _refresh_timer
+    if _refresh_timer:
+        _refresh_timer.cancel()
+    _refresh_timer = threading.Timer(max(delay, 30), _background_refresh)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
+
+def _do_refresh():
+    global _current_token, _token_expires_at
+    info = auth_manager.refresh_access_token(SPOTIFY_REFRESH_TOKEN)
+    _current_token = info["access_token"]
+    _token_expires_at = info.get("expires_at") or time.time() + info.get("expires_in", 3600)
+    _schedule_refresh(info.get("expires_in", 3600) - 60)
+    return _current_token
+
+def refresh_token():
+    global _inflight, _refresh_failed_at
+    with _token_lock:
+        fut = _inflight
+        owner = fut is None
+        if owner:
+            fut = _inflight = Future()
+    if owner:
+        try:
+            fut.set_result(_do_refresh())
+            _refresh_failed_at = 0
+        except Exception as e:
+            # back off: requests fail fast until the retry timer has run
+            _refresh_failed_at = time.time()
+            _schedule_refresh(TOKEN_RETRY_DELAY)
+            fut.set_exception(e)
+        finally:
+            with _token_lock:
+                _inflight = None
+    return fut
+
+# token/transport failures that make a metadata lookup come back empty;
+# KeyError is a token response without access_token
+SPOTIFY_AUTH_ERRORS = (SpotifyOauthError, requests.RequestException, KeyError)
+
+def _background_refresh():
+    try:
+        refresh_token().result()
+    except SPOTIFY_AUTH_ERRORS as e:
+        app.logger.warning("Spotify token refresh failed: %s", e)
+
+def get_access_token():
+    token = _current_token
+    if token and time.time() < _token_expires_at - 60:
+        return token
+    if time.time() - _refresh_failed_at < TOKEN_RETRY_DELAY:
+        raise SpotifyOauthError("Spotify token refresh failed recently; retrying in background")
+    return refresh_token().result()
+
+class _SharedTokenAuth:
+    # spotipy auth_manager shim that hands out the shared token
+    def get_access_token(self, as_dict=False):
+        return get_access_token()
+
 # Try to init Spotify client (best-effort)
 _sp = None
 try:
-    auth_manager = SpotifyOAuth(
-        client_id=SPOTIFY_CLIENT_ID,
-        client_secret=SPOTIFY_CLIENT_SECRET,
-        redirect_uri=SPOTIFY_REDIRECT_URI,
-        scope=SCOPE,
-        cache_path=None
-    )
     if SPOTIFY_REFRESH_TOKEN:
-        try:
-            auth_manager.refresh_access_token(SPOTIFY_REFRESH_TOKEN)
-        except Exception:
-            pass
-    _sp = Spotify(auth_manager=auth_manager)
+        auth_manager = SpotifyOAuth(
+            client_id=SPOTIFY_CLIENT_ID,
+            client_secret=SPOTIFY_CLIENT_SECRET,
+            redirect_uri=SPOTIFY_REDIRECT_URI,
+            scope=SCOPE,
+            cache_handler=MemoryCacheHandler(),
+            requests_session=_http
+        )
+        # refresh off the import path; early requests wait on the in-flight
+        # Future via get_access_token() instead of blocking worker startup
+        threading.Thread(target=_background_refresh, daemon=True).start()
+        _sp = Spotify(auth_manager=_SharedTokenAuth(), requests_session=_http)
+    else:
+        # no user token: an app-only token covers public metadata lookups and
+        # never falls into SpotifyOAuth's interactive browser/input() flow
+        _sp = Spotify(
+            auth_manager=SpotifyClientCredentials(
+                client_id=SPOTIFY_CLIENT_ID,
+                client_secret=SPOTIFY_CLIENT_SECRET,
+                cache_handler=MemoryCacheHandler(),
+                requests_session=_http
+            ),
+            requests_session=_http
+        )
 except Exception:
     _sp = None
 
-SPOTIFY_ID_RE = re.compile(r"([A-Za-z0-9]{22})")
+SPOTIFY_ID_RE = re.compile(r"\A[A-Za-z0-9]{22}\Z")
+SPOTIFY_ID_SCAN_RE = re.compile(r"(?<![A-Za-z0-9])([A-Za-z0-9]{22})(?![A-Za-z0-9])")
+# spotify: URIs and open./play. links, with optional intl-xx/ locale prefix;
+# user ids aren't fixed-length so they get their own branch. The open-ended
+# runs are possessive (++, Python 3.11+) so a failed match never backtracks.
+SPOTIFY_URL_RE = re.compile(
+    r"^(?:spotify:|(?:https?://)?(?:open\.|play\.)?spotify\.com/)(?:intl-[a-z-]++/)?"
+    r"(?:(track|playlist|album|artist)[/:]([A-Za-z0-9]{22})(?![A-Za-z0-9])|(user)[/:]([^/?#:\s]++))"
+)
+# any other spotify.com/<kind>/<segment> link (e.g. a mistyped id) keeps the
+# whole segment rather than a 22-char slice of it
+SPOTIFY_LINK_RE = re.compile(
+    r"^(?:https?://)?(?:open\.|play\.)?spotify\.com/(?:intl-[a-z-]++/)?([a-z]++)/([^/?#\s]++)"
+)
 
 # ==== DB HELPERS (Railway-compatible) ====
-def get_db_conn():
+class _PooledConnection(psycopg2.extensions.connection):
+    # set autocommit once when the pool opens the connection; upserts are
+    # PREPAREd lazily (tables may not exist yet when the pool opens)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.autocommit = True
+        self.statements_prepared = False
+
+def _init_pool():
     db_url = os.environ.get("DATABASE_URL") or os.environ.get("RAILWAY_DATABASE_URL")
     if not db_url:
         app.logger.warning("DATABASE_URL not set")
         return None
     try:
-        conn = psycopg2.connect(db_url, sslmode="require")
-        conn.autocommit = True
-        return conn
-    except Exception as e:
-        app.logger.warning("DB connection failed: %s", e)
+        return ThreadedConnectionPool(
+            minconn=2,
+            maxconn=int(os.environ.get("DB_POOL_MAX", 20)),
+            dsn=db_url,
+            sslmode="require",
+            connection_factory=_PooledConnection,
+        )
+    except (psycopg2.Error, ValueError) as e:
+        app.logger.warning("DB pool init failed: %s", e)
         return None
 
+# Built on first use and retried while the DB is unreachable, so a worker
+# that booted during a DB restart recovers without being restarted.
+# ThreadedConnectionPool raises instead of waiting when every connection is
+# checked out, so callers queue on _POOL_SLOTS first.
+_POOL = None
+_POOL_SLOTS = None
+_pool_lock = threading.Lock()
+_pool_retry_at = 0
+POOL_RETRY_DELAY = 5
+DB_CHECKOUT_TIMEOUT = 30
+
+def _get_pool():
+    global _POOL, _POOL_SLOTS, _pool_retry_at
+    if _POOL is None:
+        with _pool_lock:
+            if _POOL is None and time.time() >= _pool_retry_at:
+                pool = _init_pool()
+                if pool:
+                    _POOL_SLOTS = threading.BoundedSemaphore(pool.maxconn)
+                    _POOL = pool
+                else:
+                    _pool_retry_at = time.time() + POOL_RETRY_DELAY
+    return _POOL
+
+@contextmanager
+def db_conn():
+    # yields a pooled connection, or None if the DB is unavailable
+    pool = _get_pool()
+    if pool is None:
+        yield None
+        return
+    slots = _POOL_SLOTS
+    if not slots.acquire(timeout=DB_CHECKOUT_TIMEOUT):
+        app.logger.warning("DB connection failed: timed out waiting for a pooled connection")
+        yield None
+        return
+    try:
+        try:
+            conn = pool.getconn()
+        except (PoolError, psycopg2.Error) as e:
+            app.logger.warning("DB connection failed: %s", e)
+            yield None
+            return
+        try:
+            yield conn
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        slots.release()
+
 def ensure_tables(conn):
     sqls = [
         """
@@ -85,14 +285,98 @@ def ensure_tables(conn):
         )
         """
     ]
+    # one round-trip: no bound params, so psycopg2 sends this as a single
+    # simple-query batch
+    with conn.cursor() as cur:
+        cur.execute(";\n".join(sqls))
+
+_tables_ready = False
+_tables_lock = threading.Lock()
+
+def ensure_tables_once(conn):
+    # cheap no-op once the schema exists; only the first caller pays for DDL
+    global _tables_ready
+    if _tables_ready:
+        return
+    with _tables_lock:
+        if not _tables_ready:
+            ensure_tables(conn)
+            _tables_ready = True
+
+def _init_tables():
+    with db_conn() as conn:
+        if not conn:
+            return
+        try:
+            ensure_tables_once(conn)
+        except psycopg2.Error as e:
+            app.logger.warning("ensure_tables at startup failed: %s", e)
+
+_init_tables()
+
+def run_upsert(work):
+    # runs work(conn) on a pooled connection and returns an error message or
+    # None. A connection the server dropped while idle is discarded and the
+    # work retried once on a fresh one; the upserts are idempotent.
+    for attempt in range(2):
+        with db_conn() as conn:
+            if not conn:
+                return "DB unavailable"
+            try:
+                ensure_tables_once(conn)
+                work(conn)
+                return None
+            except psycopg2.OperationalError as e:
+                if attempt or not conn.closed:
+                    return str(e)
+                app.logger.warning("DB connection dropped, retrying: %s", e)
+            except (psycopg2.Error, ValueError) as e:
+                # ValueError: psycopg2 refuses strings containing NUL bytes
+                return str(e)
+
+PREPARE_UPSERTS_SQL = """
+PREPARE bl_song (text, text, text, text, boolean) AS
+    INSERT INTO blacklisted_songs (song_id, song_name, artist_id, artist_name, fixed, created_at)
+    VALUES ($1, $2, $3, $4, $5, NOW())
+    ON CONFLICT (song_id) DO UPDATE
+      SET fixed = EXCLUDED.fixed,
+          song_name = COALESCE(EXCLUDED.song_name, blacklisted_songs.song_name),
+          artist_id = COALESCE(EXCLUDED.artist_id, blacklisted_songs.artist_id),
+          artist_name = COALESCE(EXCLUDED.artist_name, blacklisted_songs.artist_name);
+PREPARE bl_playlist (text, text, boolean) AS
+    INSERT INTO user_playlists (playlist_id, playlist_name, blacklisted, updated_at)
+    VALUES ($1, $2, $3, NOW())
+    ON CONFLICT (playlist_id) DO UPDATE
+      SET playlist_name = COALESCE(EXCLUDED.playlist_name, user_playlists.playlist_name),
+          blacklisted = EXCLUDED.blacklisted,
+          updated_at = NOW();
+PREPARE wl_profile (text) AS
+    INSERT INTO whitelisted_profiles (profile_id, added_at)
+    VALUES ($1, NOW())
+    ON CONFLICT (profile_id) DO NOTHING
+"""
+
+def ensure_prepared(conn):
+    # once per pooled connection; afterwards upserts only ship parameters
+    if getattr(conn, "statements_prepared", False):
+        return
     with conn.cursor() as cur:
-        for s in sqls:
-            cur.execute(s)
+        cur.execute(PREPARE_UPSERTS_SQL)
+    conn.statements_prepared = True
 
 def upsert_blacklisted_song(conn, song_id, song_name=None, artist_id=None, artist_name=None, fixed=True):
+    ensure_prepared(conn)
+    with conn.cursor() as cur:
+        cur.execute("EXECUTE bl_song (%s, %s, %s, %s, %s)", (song_id, song_name, artist_id, artist_name, fixed))
+
+def upsert_blacklisted_songs_bulk(conn, rows):
+    # rows: (song_id, song_name, artist_id, artist_name, fixed); one round-trip
+    # per page instead of one per row. A single INSERT can't touch the same
+    # key twice under ON CONFLICT DO UPDATE, so keep the last row per song_id.
+    rows = list({r[0]: r for r in rows}.values())
     sql = """
     INSERT INTO blacklisted_songs (song_id, song_name, artist_id, artist_name, fixed, created_at)
-    VALUES (%s, %s, %s, %s, %s, NOW())
+    VALUES %s
     ON CONFLICT (song_id) DO UPDATE
       SET fixed = EXCLUDED.fixed,
           song_name = COALESCE(EXCLUDED.song_name, blacklisted_songs.song_name),
@@ -100,167 +384,271 @@ def upsert_blacklisted_song(conn, song_id, song_name=None, artist_id=None, artis
           artist_name = COALESCE(EXCLUDED.artist_name, blacklisted_songs.artist_name)
     """
     with conn.cursor() as cur:
-        cur.execute(sql, (song_id, song_name, artist_id, artist_name, fixed))
+        execute_values(cur, sql, rows, template="(%s, %s, %s, %s, %s, NOW())", page_size=500)
 
 def upsert_user_playlist_blacklist(conn, playlist_id, playlist_name=None, blacklisted=True):
-    sql = """
-    INSERT INTO user_playlists (playlist_id, playlist_name, blacklisted, updated_at)
-    VALUES (%s, %s, %s, NOW())
-    ON CONFLICT (playlist_id) DO UPDATE
-      SET playlist_name = COALESCE(EXCLUDED.playlist_name, user_playlists.playlist_name),
-          blacklisted = EXCLUDED.blacklisted,
-          updated_at = NOW()
-    """
+    ensure_prepared(conn)
     with conn.cursor() as cur:
-        cur.execute(sql, (playlist_id, playlist_name, blacklisted))
+        cur.execute("EXECUTE bl_playlist (%s, %s, %s)", (playlist_id, playlist_name, blacklisted))
 
 def upsert_whitelisted_profile(conn, profile_id):
-    sql = """
-    INSERT INTO whitelisted_profiles (profile_id, added_at)
-    VALUES (%s, NOW())
-    ON CONFLICT (profile_id) DO NOTHING
-    """
+    ensure_prepared(conn)
     with conn.cursor() as cur:
-        cur.execute(sql, (profile_id,))
+        cur.execute("EXECUTE wl_profile (%s)", (profile_id,))
 
 # ==== UTIL ====
+MEMO_INPUT_MAX = 256
+
 def extract_id_from_input(value):
+    # links and ids are short; longer input isn't memoized so the cache can't
+    # pin large request bodies
+    if value and len(value) > MEMO_INPUT_MAX:
+        return _parse_input(value)
+    return _parse_input_cached(value)
+
+def _parse_input(value):
     if not value:
         return None, None
     v = value.strip()
+    # fast path: a bare 22-char id is the most common input
+    if len(v) == 22 and v.isascii() and v.isalnum():
+        return None, v
+    m = SPOTIFY_URL_RE.match(v)
+    if m:
+        if m.group(1):
+            return m.group(1), m.group(2)
+        return m.group(3), m.group(4)
     if v.startswith("spotify:"):
         parts = v.split(":")
         if len(parts) >= 3:
             return parts[1], parts[2]
-    try:
-        p = urlparse(v)
-        if p.netloc and "spotify" in p.netloc:
-            path = p.path.strip("/")
-            parts = path.split("/")
-            if len(parts) >= 2:
-                return parts[0], parts[1].split("?")[0]
-            if parts:
-                return None, parts[0]
-    except Exception:
-        pass
-    m = SPOTIFY_ID_RE.search(v)
+    m = SPOTIFY_LINK_RE.match(v)
+    if m:
+        return m.group(1), m.group(2)
+    m = SPOTIFY_ID_SCAN_RE.search(v)
     if m:
         return None, m.group(1)
     return None, v
 
+_parse_input_cached = lru_cache(maxsize=4096)(_parse_input)
+
+def resolve_id(val, expected_kind):
+    # parsed id, or the first 22-char id inside a link of another kind
+    kind, id_or_raw = extract_id_from_input(val)
+    if kind and kind != expected_kind:
+        m = SPOTIFY_ID_SCAN_RE.search(id_or_raw)
+        if m:
+            return m.group(1)
+    return id_or_raw
+
+# ==== SPOTIFY METADATA CACHE ====
+# lookups are kept for an hour and unknown ids are remembered briefly so a
+# bad id doesn't hammer the API on every retry. Both are plain dicts (not
+# lru_cache) so the bulk path can read and fill them per id.
+METADATA_TTL = 3600
+NEGATIVE_TTL = 60
+LOOKUP_CACHE_MAX = 2048
+# only "this id doesn't exist" is remembered; 401/429/5xx are transient
+MISS_STATUSES = (400, 404)
+_lookup_hits = {}
+_lookup_misses = {}
+
+def _cache_get(key):
+    entry = _lookup_hits.get(key)
+    if entry and entry[0] > time.time():
+        return entry[1]
+    return None
+
+def _cache_put(key, meta):
+    if len(_lookup_hits) > LOOKUP_CACHE_MAX:
+        _lookup_hits.clear()
+    _lookup_hits[key] = (time.time() + METADATA_TTL, meta)
+
+def _recent_miss(key):
+    expires_at = _lookup_misses.get(key)
+    return expires_at is not None and expires_at > time.time()
+
+def _record_miss(key):
+    if len(_lookup_misses) > LOOKUP_CACHE_MAX:
+        _lookup_misses.clear()
+    _lookup_misses[key] = time.time() + NEGATIVE_TTL
+
+def _track_meta(t):
+    artists = t.get("artists") or []
+    artist = artists[0] if artists else {}
+    return t.get("name"), artist.get("id"), artist.get("name")
+
+def _playlist_meta(p):
+    owner = p.get("owner") or {}
+    return p.get("name"), owner.get("id")
+
+def _cached_lookup(kind, item_id, fetch):
+    key = (kind, item_id)
+    if not _sp or not SPOTIFY_ID_RE.match(item_id) or _recent_miss(key):
+        return None
+    meta = _cache_get(key)
+    if meta:
+        return meta
+    try:
+        meta = fetch(item_id)
+    except spotipy.SpotifyException as e:
+        if e.http_status in MISS_STATUSES:
+            _record_miss(key)
+        return None
+    except SPOTIFY_AUTH_ERRORS:
+        return None
+    _cache_put(key, meta)
+    return meta
+
+def _cached_track(track_id):
+    # (name, artist_id, artist_name) or None
+    return _cached_lookup("track", track_id, lambda i: _track_meta(_sp.track(i)))
+
+def _cached_playlist(pid):
+    # (name, owner_id) or None
+    return _cached_lookup("playlist", pid, lambda i: _playlist_meta(_sp.playlist(i, fields="name,owner.id")))
+
+TRACKS_PER_LOOKUP = 50  # Web API limit for GET /tracks
+
+def _cached_tracks(track_ids):
+    # {track_id: (name, artist_id, artist_name)} for bulk requests; cached ids
+    # are served locally, the rest fetched 50 per API call
+    meta = {}
+    if not _sp:
+        return meta
+    todo = []
+    for track_id in track_ids:
+        key = ("track", track_id)
+        if not SPOTIFY_ID_RE.match(track_id) or _recent_miss(key):
+            continue
+        hit = _cache_get(key)
+        if hit:
+            meta[track_id] = hit
+        else:
+            todo.append(track_id)
+    for i in range(0, len(todo), TRACKS_PER_LOOKUP):
+        chunk = todo[i:i + TRACKS_PER_LOOKUP]
+        try:
+            found = _sp.tracks(chunk).get("tracks") or []
+        except (spotipy.SpotifyException,) + SPOTIFY_AUTH_ERRORS:
+            continue
+        for track_id, t in zip(chunk, found):
+            key = ("track", track_id)
+            if t:
+                meta[track_id] = _track_meta(t)
+                _cache_put(key, meta[track_id])
+            else:
+                # GET /tracks returns null for ids that don't exist
+                _record_miss(key)
+    return meta
+
 # ==== HTTP routes ====
+INDEX_MAX_AGE = 300
+
+def _load_index():
+    # read once at startup so repeat visits get a 304 without touching disk
+    try:
+        with open(os.path.join(app.static_folder, "index.html"), "rb") as f:
+            body = f.read()
+    except OSError:
+        return None, None
+    return body, hashlib.sha1(body).hexdigest()
+
+_INDEX_HTML, _INDEX_ETAG = _load_index()
+
 @app.route("/", methods=["GET"])
 def index():
     # serve the static frontend file
-    return send_from_directory(app.static_folder, "index.html")
+    if _INDEX_HTML is None or app.debug:
+        return send_from_directory(app.static_folder, "index.html", conditional=True, max_age=INDEX_MAX_AGE)
+    resp = Response(_INDEX_HTML, mimetype="text/html")
+    resp.set_etag(_INDEX_ETAG)
+    resp.cache_control.max_age = INDEX_MAX_AGE
+    return resp.make_conditional(request)
 
-@app.route("/api/blacklist_track", methods=["POST"])
-def api_blacklist_track():
-    payload = request.get_json() or {}
-    val = (payload.get("input") or "").strip()
-    kind, id_or_raw = extract_id_from_input(val)
-    track_id = id_or_raw
-    if kind and kind != "track":
-        if SPOTIFY_ID_RE.search(id_or_raw):
-            track_id = SPOTIFY_ID_RE.search(id_or_raw).group(1)
-    if not track_id:
-        return jsonify({"ok": False, "error": "Could not parse track id"}), 400
+MAX_BULK_INPUTS = 200
 
+def _blacklist_track_row(track_id):
     song_name = None
     artist_id = None
     artist_name = None
-    if _sp:
-        try:
-            t = _sp.track(track_id)
-            song_name = t.get("name")
-            artists = t.get("artists") or []
-            if artists:
-                artist_id = artists[0].get("id")
-                artist_name = artists[0].get("name")
-        except Exception:
-            pass
-
-    conn = get_db_conn()
-    if not conn:
-        return jsonify({"ok": False, "error": "DB unavailable"}), 500
-    try:
-        ensure_tables(conn)
-        upsert_blacklisted_song(conn, track_id, song_name, artist_id, artist_name, True)
-        return jsonify({"ok": True, "msg": f"Blacklisted track {track_id} (fixed=true)"}), 200
-    except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
-    finally:
-        conn.close()
+    meta = _cached_track(track_id)
+    if meta:
+        song_name, artist_id, artist_name = meta
+    return track_id, song_name, artist_id, artist_name, True
+
+@app.route("/api/blacklist_track", methods=["POST"])
+def api_blacklist_track():
+    payload = request.get_json(silent=True, cache=False) or {}
+    # accepts {"input": "..."} or {"inputs": ["...", ...]}
+    vals = payload.get("inputs")
+    if not isinstance(vals, list):
+        vals = [payload.get("input")]
+    if len(vals) > MAX_BULK_INPUTS:
+        return jsonify({"ok": False, "error": f"At most {MAX_BULK_INPUTS} inputs per request"}), 400
+    track_ids = [resolve_id(v.strip(), "track") if isinstance(v, str) else None for v in vals]
+    if not track_ids or not all(track_ids):
+        return jsonify({"ok": False, "error": "Could not parse track id"}), 400
+    track_ids = list(dict.fromkeys(track_ids))
+
+    if len(track_ids) == 1:
+        row = _blacklist_track_row(track_ids[0])
+        error = run_upsert(lambda c: upsert_blacklisted_song(c, *row))
+        msg = f"Blacklisted track {track_ids[0]} (fixed=true)"
+    else:
+        meta = _cached_tracks(track_ids)
+        rows = [(track_id, *meta.get(track_id, (None, None, None)), True) for track_id in track_ids]
+        error = run_upsert(lambda c: upsert_blacklisted_songs_bulk(c, rows))
+        msg = f"Blacklisted {len(rows)} tracks (fixed=true)"
+    if error:
+        return jsonify({"ok": False, "error": error}), 500
+    return jsonify({"ok": True, "msg": msg}), 200
 
 @app.route("/api/blacklist_playlist", methods=["POST"])
 def api_blacklist_playlist():
-    payload = request.get_json() or {}
+    payload = request.get_json(silent=True, cache=False) or {}
     val = (payload.get("input") or "").strip()
     blacklisted_flag = bool(payload.get("blacklisted", True))
 
-    kind, id_or_raw = extract_id_from_input(val)
-    playlist_id = id_or_raw
-    if kind and kind != "playlist":
-        if SPOTIFY_ID_RE.search(id_or_raw):
-            playlist_id = SPOTIFY_ID_RE.search(id_or_raw).group(1)
+    playlist_id = resolve_id(val, "playlist")
     if not playlist_id:
         return jsonify({"ok": False, "error": "Could not parse playlist id"}), 400
 
     pname = None
-    if _sp:
-        try:
-            p = _sp.playlist(playlist_id)
-            pname = p.get("name")
-        except Exception:
-            pass
-
-    conn = get_db_conn()
-    if not conn:
-        return jsonify({"ok": False, "error": "DB unavailable"}), 500
-    try:
-        ensure_tables(conn)
-        upsert_user_playlist_blacklist(conn, playlist_id, pname, blacklisted=blacklisted_flag)
-        return jsonify({"ok": True, "msg": f"Playlist {playlist_id} upserted with blacklisted={blacklisted_flag}"}), 200
-    except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
-    finally:
-        conn.close()
+    meta = _cached_playlist(playlist_id)
+    if meta:
+        pname = meta[0]
+
+    error = run_upsert(lambda c: upsert_user_playlist_blacklist(c, playlist_id, pname, blacklisted=blacklisted_flag))
+    if error:
+        return jsonify({"ok": False, "error": error}), 500
+    return jsonify({"ok": True, "msg": f"Playlist {playlist_id} upserted with blacklisted={blacklisted_flag}"}), 200
 
 @app.route("/api/whitelist_profile", methods=["POST"])
 def api_whitelist_profile():
-    payload = request.get_json() or {}
+    payload = request.get_json(silent=True, cache=False) or {}
     val = (payload.get("input") or "").strip()
     kind, id_or_raw = extract_id_from_input(val)
     candidate_id = id_or_raw
 
-    maybe_kind, maybe_id = extract_id_from_input(val)
-    if maybe_kind == "playlist" or (not maybe_kind and SPOTIFY_ID_RE.search(candidate_id)):
-        if _sp:
-            try:
-                plist = _sp.playlist(maybe_id)
-                owner = plist.get("owner") or {}
-                owner_id = owner.get("id")
-                if owner_id:
-                    candidate_id = owner_id
-            except Exception:
-                pass
+    if kind == "playlist" or (not kind and candidate_id and SPOTIFY_ID_RE.fullmatch(candidate_id)):
+        meta = _cached_playlist(id_or_raw)
+        if meta and meta[1]:
+            candidate_id = meta[1]
 
     if not candidate_id:
         return jsonify({"ok": False, "error": "Could not parse profile or playlist owner id"}), 400
 
-    conn = get_db_conn()
-    if not conn:
-        return jsonify({"ok": False, "error": "DB unavailable"}), 500
-    try:
-        ensure_tables(conn)
-        upsert_whitelisted_profile(conn, candidate_id)
-        return jsonify({"ok": True, "msg": f"Whitelisted profile {candidate_id}"}), 200
-    except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
-    finally:
-        conn.close()
+    error = run_upsert(lambda c: upsert_whitelisted_profile(c, candidate_id))
+    if error:
+        return jsonify({"ok": False, "error": error}), 500
+    return jsonify({"ok": True, "msg": f"Whitelisted profile {candidate_id}"}), 200
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    debug = os.environ.get("FLASK_DEBUG", "0") == "1"
-    app.run(host="0.0.0.0", port=port, debug=debug)
\ No newline at end of file
+    if os.environ.get("USE_GEVENT"):
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(("0.0.0.0", port), app).serve_forever()
+    else:
+        debug = os.environ.get("FLASK_DEBUG", "0") == "1"
+        app.run(host="0.0.0.0", port=port, debug=debug)